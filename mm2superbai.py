@@ -2,13 +2,91 @@ import traceback
 import logging
 import coloredlogs
 import os
+import errno
 import json
+import math
 from datetime import datetime
 import shutil # ファイルコピーのために追加
 import argparse
-from typing import List, Dict, Tuple, Any
-import cv2
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Any, Optional
+from PIL import Image
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# 画像ファイルとアノテーションファイルの拡張子
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+ANNOTATION_EXTENSIONS = ('.json',)
+
+# ファイル入出力を並列に行うスレッド数
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# EXIFの向き(Orientation)タグ
+EXIF_ORIENTATION_TAG = 0x0112
+
+# JSONの読み書き (orjsonがインストールされていれば高速な実装を使用する)
+if orjson is not None:
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+else:
+    def _json_dumps(obj: Any) -> str:
+        try:
+            return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+        except ValueError:
+            # orjsonと同じく NaN/Infinity は null として書き出す
+            return json.dumps(_replace_non_finite(obj), ensure_ascii=False, allow_nan=False,
+                              separators=(',', ':'))
+
+def _replace_non_finite(obj: Any) -> Any:
+    """NaN/Infinity を None に置き換える
 
+    Parameters
+    ----------
+    obj: Any
+        JSONに変換するデータ
+
+    Returns
+    -------
+    Any
+        NaN/Infinity を None に置き換えたデータ
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _replace_non_finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_non_finite(value) for value in obj]
+    return obj
+
+def _json_loads(data: bytes) -> Any:
+    """JSONのバイト列を解析する
+
+    orjsonがインストールされていればorjsonで解析します。
+    orjsonが受け付けない NaN/Infinity やBOM付きのデータは標準のjsonモジュールで解析し直すため、
+    orjsonの有無に関わらず同じファイルを読み込めます。
+    読み込んだ NaN/Infinity は書き出し時に null になります。
+
+    Parameters
+    ----------
+    data: bytes
+        JSONのバイト列
+
+    Returns
+    -------
+    Any
+        解析したJSONデータ
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # 標準のjsonモジュールで解析し直す
+    return json.loads(data)
 
 # ログの設定
 logger = logging.getLogger(__name__)
@@ -34,17 +112,20 @@ def read_mm_roi_config(roi_config_path: str) -> Dict[str, Any]:
     Raises
     ------
     ValueError
-        ROI設定ファイルに "startXRatio", "startYRatio", "widthRatio", "heightRatio" が見つからなかった場合は、
-        その旨のエラーメッセージを出力します。
+        ROI設定ファイルが空の場合、または "startXRatio", "startYRatio", "widthRatio", "heightRatio" が
+        見つからなかった場合は、見つからなかったキーをすべて含むエラーメッセージを出力します。
     """
-    with open(roi_config_path, 'r', encoding='utf-8') as f:
-        roi_config = json.load(f)
+    with open(roi_config_path, 'rb') as f:
+        roi_config = _json_loads(f.read())
     
+    if not roi_config:
+        raise ValueError(f"ROI設定ファイルにROI設定がありません: {roi_config_path}")
+
     # 必要なキーが存在するか確認
-    required_keys = ["startXRatio", "startYRatio", "widthRatio", "heightRatio"]
-    for key in required_keys:
-        if key not in roi_config[0]:
-            raise ValueError(f"ROI設定ファイルに {key} が見つかりません。")
+    required_keys = {"startXRatio", "startYRatio", "widthRatio", "heightRatio"}
+    missing_keys = required_keys - roi_config[0].keys()
+    if missing_keys:
+        raise ValueError(f"ROI設定ファイルに {', '.join(sorted(missing_keys))} が見つかりません。")
 
     return roi_config[0]
 
@@ -71,16 +152,34 @@ def read_mm_images(image_directory: str) -> List[str]:
         その旨のエラーメッセージを出力し、
         そのディレクトリが存在しない場合は、FileNotFoundErrorをスローします。
     """
-    # 画像ディレクトリの存在を確認
-    image_files = [f for f in os.listdir(image_directory) if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
-    if not image_files:
-        raise FileNotFoundError(f"画像ファイルが見つかりません: {image_directory}")
-    
     # 画像ファイルのフルパスを取得
-    image_files_path = [os.path.join(image_directory, filename) for filename in image_files]
+    with os.scandir(image_directory) as entries:
+        image_files_path = [e.path for e in entries
+                            if e.name.lower().endswith(IMAGE_EXTENSIONS) and e.is_file()]
+    if not image_files_path:
+        raise FileNotFoundError(f"画像ファイルが見つかりません: {image_directory}")
     
     return image_files_path
 
+def _load_mm_annotation(annotation_file: str) -> Dict[str, Any]:
+    """Mech-Mind DLK形式のアノテーションファイルを1つ読み込む
+
+    Parameters
+    ----------
+    annotation_file: str
+        アノテーションファイルのパス
+
+    Returns
+    -------
+    Dict[str, Any]
+        読み込んだアノテーションデータ。"annotation_filename" にファイルパスを追加します。
+    """
+    with open(annotation_file, 'rb') as f:
+        json_data = _json_loads(f.read())
+    json_data['annotation_filename'] = annotation_file
+
+    return json_data
+
 def read_mm_annotations(annotation_directory: str) -> List[Dict[str, Any]]:
     """Mech-Mind DLK形式のアノテーションディレクトリからアノテーションデータを読み込む
 
@@ -105,19 +204,40 @@ def read_mm_annotations(annotation_directory: str) -> List[Dict[str, Any]]:
         その旨のエラーメッセージを出力し、
         そのディレクトリが存在しない場合は、FileNotFoundErrorをスローします。
     """
-    annotation_files = [f for f in os.listdir(annotation_directory) if f.lower().endswith('.json')]
-    if not annotation_files:
+    with os.scandir(annotation_directory) as entries:
+        annotation_files_path = [e.path for e in entries
+                                 if e.name.lower().endswith(ANNOTATION_EXTENSIONS) and e.is_file()]
+    if not annotation_files_path:
         raise FileNotFoundError(f"アノテーションファイルが見つかりません: {annotation_directory}")
     
-    annotations = []
-    for filename in annotation_files:
-        with open(os.path.join(annotation_directory, filename), 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
-            json_data['annotation_filename'] = os.path.join(annotation_directory, filename)
-            annotations.append(json_data)
+    # アノテーションファイルは互いに独立しているためスレッドで並列に読み込む
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        annotations = list(executor.map(_load_mm_annotation, annotation_files_path))
     
     return annotations
 
+def _file_stem(path: str) -> str:
+    """拡張子を除いたファイル名を取得する
+
+    os.path.splitext(os.path.basename(path))[0] と同じ結果を返します。
+
+    Parameters
+    ----------
+    path: str
+        ファイルパス
+
+    Returns
+    -------
+    str
+        拡張子を除いたファイル名
+    """
+    filename = os.path.basename(path)
+    dot_index = filename.rfind('.')
+    # 先頭のドットのみの場合 (隠しファイルなど) は拡張子として扱わない
+    if dot_index <= 0 or not filename[:dot_index].lstrip('.'):
+        return filename
+    return filename[:dot_index]
+
 def read_mm_dataset(input_dir: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
     """Mech-Mind DLK形式のデータセットを読み込む
 
@@ -148,18 +268,20 @@ def read_mm_dataset(input_dir: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]
     # アノテーションデータリストを取得する
     annotations = read_mm_annotations(annotation_directory)
 
+    # アノテーションデータをファイル名(拡張子なし)で索引化
+    annotation_index = {}
+    for annotation in annotations:
+        annotations_filebase = _file_stem(annotation['annotation_filename'])
+        annotation_index.setdefault(annotations_filebase, annotation)
+
     # 画像ファイルとアノテーションデータが一致するか確認
     dataset = []
     for image_file in image_files:
-        for annotation in annotations:
-            image_filebase = os.path.basename(image_file)
-            image_filebase = os.path.splitext(image_filebase)[0]
-            annotations_filebase = os.path.basename(annotation['annotation_filename'])
-            annotations_filebase = os.path.splitext(annotations_filebase)[0]            
-            if image_filebase == annotations_filebase:
-                annotation['image_filename'] = image_file  # アノテーションに画像ファイル名を追加                
-                dataset.append(annotation)
-                break
+        image_filebase = _file_stem(image_file)
+        annotation = annotation_index.get(image_filebase)
+        if annotation is not None:
+            # 同名の画像が複数ある場合に備えて、画像ごとにアノテーションデータを複製して画像ファイル名を追加
+            dataset.append({**annotation, 'image_filename': image_file})
 
     return roi_config, dataset
 
@@ -190,19 +312,56 @@ def check_mm_data_dir(input_dir: str):
     
     logger.info(f"Mech-Mind DLK形式のデータセットディレクトリ {input_dir} が確認されました。")
 
-def create_output_directory(output_dir: str):
+def _clear_directory(directory: str):
+    """ディレクトリ自体は残したまま中身を削除する
+
+    シンボリックリンクやファイルの場合はリンク先を辿らず、それ自体を削除します。
+
+    Parameters
+    ----------
+    directory: str
+        中身を削除するディレクトリのパス
+    """
+    if os.path.islink(directory) or (os.path.lexists(directory) and not os.path.isdir(directory)):
+        os.unlink(directory)
+        return
+    if not os.path.isdir(directory):
+        return
+
+    with os.scandir(directory) as entries:
+        files = []
+        for e in entries:
+            if e.is_dir(follow_symlinks=False):
+                shutil.rmtree(e.path)
+            else:
+                files.append(e.path)
+
+    # ファイル数が多い場合に備えてスレッドで並列に削除する
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(executor.map(os.unlink, files))
+
+def create_output_directory(output_dir: str, clean: bool = False):
     """出力ディレクトリの作成と初期化
 
-    出力ディレクトリを作成します。既存のディレクトリがあれば削除して新たに作成します。
+    出力ディレクトリを作成します。
+    clean が True の場合は既存のディレクトリを削除して新たに作成し、
+    False の場合は "data" と "annotations" サブディレクトリの中身のみを削除します。
 
     Parameters
     ----------
     output_dir: str
         出力ディレクトリのパス
+    clean: bool
+        既存の出力ディレクトリ全体を削除するかどうか
     """
-    # 出力ディレクトリが既に存在する場合は削除
-    if os.path.exists(output_dir):
-        shutil.rmtree(output_dir)
+    if clean:
+        # 出力ディレクトリが既に存在する場合は削除
+        if os.path.exists(output_dir):
+            shutil.rmtree(output_dir)
+    else:
+        # 既存の出力ファイルのみを削除
+        _clear_directory(os.path.join(output_dir, 'data'))
+        _clear_directory(os.path.join(output_dir, 'annotations'))
     # 新しい出力ディレクトリを作成
     os.makedirs(output_dir, exist_ok=True)
     # 必要なサブディレクトリを作成
@@ -211,7 +370,154 @@ def create_output_directory(output_dir: str):
 
     logger.info(f"出力ディレクトリ {output_dir} を作成しました。")
 
-def create_superbai_dataset(roi_config: Dict[str, Any], dataset: List[Dict[str, Any]], output_dir: str):
+def _flatten_contour(contour: List[Any], offset_x: float, offset_y: float) -> List[float]:
+    """輪郭座標をオフセットしてCOCOのセグメンテーション形式に平坦化する
+
+    Parameters
+    ----------
+    contour: List[Any]
+        OpenCV形式 ([[x, y]] の配列) の輪郭座標
+    offset_x: float
+        X座標に加えるオフセット
+    offset_y: float
+        Y座標に加えるオフセット
+
+    Returns
+    -------
+    List[float]
+        [x1, y1, x2, y2, ...] 形式の座標リスト
+    """
+    # JSONから読み込んだ輪郭はPythonのリストのため、NumPy配列に変換せずにそのまま処理する
+    flat_contour = []
+    append = flat_contour.append
+    for point in contour:
+        xy = point[0]
+        if len(xy) == 2:
+            append(xy[0] + offset_x)
+            append(xy[1] + offset_y)
+
+    return flat_contour
+
+def _fast_copy(src: str, dst: str, link: bool = False):
+    """ファイルをできるだけ高速にコピーする
+
+    link が True の場合はハードリンクを作成します。
+    それ以外はカーネル内でのコピー (copy_file_range) を試み、
+    使用できない場合は shutil.copyfile にフォールバックします。
+    コピー元を上書きしないよう、コピー先が既に存在する場合はコピーしません。
+
+    Parameters
+    ----------
+    src: str
+        コピー元のファイルパス
+    dst: str
+        コピー先のファイルパス
+    link: bool
+        ハードリンクを作成するかどうか
+
+    Raises
+    ------
+    shutil.SameFileError
+        コピー元とコピー先が同じファイルの場合
+    FileExistsError
+        コピー先のファイルが既に存在する場合
+    """
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError as e:
+            # 別ファイルシステムなどハードリンクできない場合のみ通常のコピーを行う
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP):
+                raise
+
+    if os.path.lexists(dst):
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            raise shutil.SameFileError(f"{src} と {dst} は同じファイルです。")
+        raise FileExistsError(errno.EEXIST, "コピー先のファイルが既に存在します", dst)
+
+    if hasattr(os, 'copy_file_range'):
+        # 'xb' で開き、既存のファイル (コピー元へのハードリンクを含む) を切り詰めないようにする
+        with open(src, 'rb') as fsrc, open(dst, 'xb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            except OSError:
+                pass  # copy_file_range が使用できない場合は shutil.copyfile でコピーし直す
+        if remaining == 0:
+            return
+
+    # dst はこの関数で新規作成したファイルのため上書きしてよい
+    shutil.copyfile(src, dst)
+
+def _copy_superbai_image(image_filename: str, image_directory: str, link: bool = False) -> Optional[Tuple[int, int]]:
+    """画像サイズを取得し、画像ファイルを出力ディレクトリにコピーする
+
+    Parameters
+    ----------
+    image_filename: str
+        コピー元の画像ファイルのパス
+    image_directory: str
+        コピー先の画像ディレクトリのパス
+    link: bool
+        コピーの代わりにハードリンクを作成するかどうか
+
+    Returns
+    -------
+    Optional[Tuple[int, int]]
+        画像の幅と高さのタプル。画像が読み込めない場合は None を返します。
+    """
+    # 画素データはデコードせず、ヘッダーから画像サイズのみを取得する
+    try:
+        with Image.open(image_filename) as image:
+            width, height = image.size
+            # EXIFの向きが90度回転の場合は幅と高さを入れ替える
+            if image.getexif().get(EXIF_ORIENTATION_TAG) in (5, 6, 7, 8):
+                width, height = height, width
+    except OSError:
+        return None
+
+    # 画像ファイルを出力ディレクトリにコピー
+    destination_image_filename = os.path.join(image_directory, os.path.basename(image_filename))
+    _fast_copy(image_filename, destination_image_filename, link)
+
+    return width, height
+
+def write_coco_json(coco_format: Dict[str, Any], output_path: str):
+    """COCOフォーマットのアノテーションデータをJSONファイルに書き出す
+
+    データセット全体を1つの文字列にせず、リストの要素ごとに逐次書き出します。
+    出力サイズと書き出し時間を抑えるためインデントは付けません。
+
+    Parameters
+    ----------
+    coco_format: Dict[str, Any]
+        COCOフォーマットのアノテーションデータ
+    output_path: str
+        出力するJSONファイルのパス
+    """
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('{')
+        for i, (key, value) in enumerate(coco_format.items()):
+            if i > 0:
+                f.write(',')
+            f.write(_json_dumps(key) + ':')
+            if isinstance(value, list):
+                f.write('[')
+                for j, item in enumerate(value):
+                    if j > 0:
+                        f.write(',')
+                    f.write(_json_dumps(item))
+                f.write(']')
+            else:
+                f.write(_json_dumps(value))
+        f.write('}')
+
+def create_superbai_dataset(roi_config: Dict[str, Any], dataset: List[Dict[str, Any]], output_dir: str, link: bool = False):
     """Mech-Mind DLK形式のデータセットをSuperbAI形式に変換
 
     Mech-Mind DLK形式のROI設定とアノテーションデータをSuperbAI形式に変換し、
@@ -225,26 +531,29 @@ def create_superbai_dataset(roi_config: Dict[str, Any], dataset: List[Dict[str,
         アノテーションデータのリスト
     output_dir: str
         出力ディレクトリのパス
+    link: bool
+        画像ファイルをコピーする代わりにハードリンクを作成するかどうか
     """
     # COCOフォーマットのデータセットを作成
     image_directory = os.path.join(output_dir, 'data')
     annotation_directory = os.path.join(output_dir, 'annotations')
 
     # ROI設定の取得
-    roi_x_ratio = roi_config.get("startXRatio")
-    roi_y_ratio = roi_config.get("startYRatio")
-    roi_width_ratio = roi_config.get("widthRatio")
-    roi_height_ratio = roi_config.get("heightRatio")
+    roi_x_ratio = float(roi_config["startXRatio"])
+    roi_y_ratio = float(roi_config["startYRatio"])
+    roi_width_ratio = float(roi_config["widthRatio"])
+    roi_height_ratio = float(roi_config["heightRatio"])
 
     # COOCOアノテーションデータの初期化
+    now = datetime.now()
     coco_format = {
         "info": {
-            "year": datetime.now().year,
+            "year": now.year,
             "version": "1.0",
             "description": "Converted dataset to COCO format from Mech-Mind DLK format.",
             "contributor": "SuperbAI",
             "url": "",
-            "date_created": datetime.now().isoformat()
+            "date_created": now.isoformat()
         },
         "licenses": [
             {
@@ -257,16 +566,24 @@ def create_superbai_dataset(roi_config: Dict[str, Any], dataset: List[Dict[str,
         "annotations": [],
         "categories": []
     }
-    coco_category_map = []
-
-    for idx, data in enumerate(dataset):
+    coco_images = coco_format["images"]
+    coco_annotations = coco_format["annotations"]
+    coco_categories = coco_format["categories"]
+    coco_category_map = {}  # ラベル -> カテゴリID
+
+    # 画像の読み込みとコピーは画像ごとに独立しているためスレッドで並列に実行する
+    image_filenames = [data["image_filename"] for data in dataset]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        image_sizes = list(executor.map(_copy_superbai_image, image_filenames,
+                                        [image_directory] * len(image_filenames), [link] * len(image_filenames)))
+
+    for idx, (data, image_size) in enumerate(zip(dataset, image_sizes)):
         # 画像情報の取得
         image_filename = data["image_filename"]
-        image = cv2.imread(image_filename)
-        if image is None:
-            logger.warning(f"画像ファイル {image_filename} が読み込めません。スキップします。")
+        if image_size is None:
+            logger.warning("画像ファイル %s が読み込めません。スキップします。", image_filename)
             continue
-        height, width = image.shape[:2]
+        width, height = image_size
 
         # ROIの計算
         roi_x = int(width * roi_x_ratio)
@@ -283,7 +600,7 @@ def create_superbai_dataset(roi_config: Dict[str, Any], dataset: List[Dict[str,
             "license": 1,
             "date_captured": ""
         }
-        coco_format["images"].append(coco_image)
+        coco_images.append(coco_image)
 
         # COCO annotations セクションの追加
         for obj in data.get("objects", []):
@@ -292,15 +609,15 @@ def create_superbai_dataset(roi_config: Dict[str, Any], dataset: List[Dict[str,
             contours = obj.get("contours")
 
             if not label or not bndbox or not contours:
-                logger.warning(f"オブジェクトにラベルまたはバウンディングボックスがありません: {data}")
+                logger.warning("オブジェクトにラベルまたはバウンディングボックスがありません: %r", data)
                 continue
 
             # カテゴリIDの追加
             if label not in coco_category_map:
-                coco_category_map.append(label)
-                category_id = coco_category_map.index(label) + 1
+                category_id = len(coco_category_map) + 1
+                coco_category_map[label] = category_id
 
-                coco_format["categories"].append({
+                coco_categories.append({
                     "id": category_id,
                     "name": label,
                     "supercategory": "object"  # デフォルトでobjectとする
@@ -314,38 +631,35 @@ def create_superbai_dataset(roi_config: Dict[str, Any], dataset: List[Dict[str,
                 bndbox_width,
                 bndbox_height
             ]
+            bbox_out = coco_bbox
+            bndbox_area = bndbox_width * bndbox_height
+            # 整数座標の場合は丸め処理が不要なため、小数を含む場合のみ丸める
+            # (セグメンテーション座標のオフセットには丸める前の値を使用する)
+            if not all(type(coord) is int for coord in bndbox):
+                bbox_out = [round(coord, 2) for coord in coco_bbox]
+                bndbox_area = round(bndbox_area, 2)
 
             # セグメンテーション座標の追加
             coco_segmentation = []
             for contour in contours:
-                flat_contour = []
-                for point in contour:
-                    if len(point[0]) == 2:
-                        seg_x = point[0][0] + coco_bbox[0]
-                        seg_y = point[0][1] + coco_bbox[1]
-                        flat_contour.extend([seg_x, seg_y])
+                flat_contour = _flatten_contour(contour, coco_bbox[0], coco_bbox[1])
                 if flat_contour:
                     coco_segmentation.append(flat_contour)
 
             # COCO annotations セクションの追加
             coco_annotation = {
-                "id": len(coco_format["annotations"]) + 1,
+                "id": len(coco_annotations) + 1,
                 "image_id": coco_image["id"],
-                "category_id": coco_category_map.index(label) + 1,
-                "bbox": [round(coord, 2) for coord in coco_bbox],
-                "area": round(bndbox_width * bndbox_height, 2),
+                "category_id": coco_category_map[label],
+                "bbox": bbox_out,
+                "area": bndbox_area,
                 "iscrowd": 0,
                 "segmentation": coco_segmentation if coco_segmentation else []
             }
-            coco_format["annotations"].append(coco_annotation)
-
-        # 画像ファイルを出力ディレクトリにコピー
-        destination_image_filename = os.path.join(image_directory, os.path.basename(image_filename))
-        shutil.copyfile(image_filename, destination_image_filename)
+            coco_annotations.append(coco_annotation)
 
     # アノテーションデータを書きだし
-    with open(os.path.join(annotation_directory, "instances_train2017.json"), 'w', encoding='utf-8') as f:
-        json.dump(coco_format, f, indent=4, ensure_ascii=False)
+    write_coco_json(coco_format, os.path.join(annotation_directory, "instances_train2017.json"))
 
     # ログ出力
     logger.info(f"COCOフォーマットのデータセットを {output_dir} に保存しました。")
@@ -353,12 +667,53 @@ def create_superbai_dataset(roi_config: Dict[str, Any], dataset: List[Dict[str,
     logger.info(f"画像ファイル数: {len(coco_format['images'])}")
     logger.info(f"アノテーション数: {len(coco_format['annotations'])}")
 
+def archive_superbai_dataset(output_dir: str) -> str:
+    """出力ディレクトリをZIPファイルにまとめる
+
+    "data" と "annotations" サブディレクトリのみを格納し、
+    出力ディレクトリに残っているそれ以外のファイルは含めません。
+    JPEG/PNG画像は既に圧縮されているため無圧縮で格納し、
+    アノテーションなどそれ以外のファイルのみDeflateで圧縮します。
+
+    Parameters
+    ----------
+    output_dir: str
+        出力ディレクトリのパス
+
+    Returns
+    -------
+    str
+        作成したZIPファイルのパス
+    """
+    output_dir = os.path.abspath(output_dir)
+    root_dir = os.path.dirname(output_dir)
+    zip_filename = output_dir + '.zip'
+
+    with zipfile.ZipFile(zip_filename, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.write(output_dir, os.path.relpath(output_dir, root_dir))
+        for subdir in ('annotations', 'data'):
+            for dirpath, dirnames, filenames in os.walk(os.path.join(output_dir, subdir)):
+                dirnames.sort()
+                zf.write(dirpath, os.path.relpath(dirpath, root_dir))
+                for filename in sorted(filenames):
+                    path = os.path.join(dirpath, filename)
+                    if filename.lower().endswith(IMAGE_EXTENSIONS):
+                        compress_type = zipfile.ZIP_STORED
+                    else:
+                        compress_type = zipfile.ZIP_DEFLATED
+                    zf.write(path, os.path.relpath(path, root_dir), compress_type=compress_type)
+
+    return zip_filename
+
 if __name__ == '__main__':
     try:
         # 引数管理
         parser = argparse.ArgumentParser(description='Convert dataset to COCO format from Mech-Mind DLK format.')
         parser.add_argument('--input', '-i', type=str, default='mm_data', help='Input directory for Mech-Mind DLK format deataset.')
         parser.add_argument('--output', '-o', type=str, default='output', help='Output directory for COCO format dataset.')
+        parser.add_argument('--link', action='store_true', help='Hard-link image files into the output directory instead of copying them.')
+        parser.add_argument('--clean', action='store_true', help='Remove the whole output directory before conversion.')
+        parser.add_argument('--archive-format', type=str, choices=['zip', 'none'], default='zip', help='Archive format for the output directory.')
         args = parser.parse_args()
 
         # 入出力ディレクトリのパスを設定
@@ -369,20 +724,20 @@ if __name__ == '__main__':
         check_mm_data_dir(input_dir)
 
         # 出力ディレクトリの再作成
-        create_output_directory(output_dir)
+        create_output_directory(output_dir, clean=args.clean)
 
         # Mech-Mind DLK形式のデータセットを読み込む
         roi_config, dataset = read_mm_dataset(input_dir)
 
         # COCOフォーマットのデータセットを作成
-        create_superbai_dataset(roi_config, dataset, output_dir)
+        create_superbai_dataset(roi_config, dataset, output_dir, link=args.link)
         logger.info(f"COCOフォーマットデータセットを {output_dir} に保存しました。")
 
         # COCOデータセットをZIP圧縮
-        zip_filename = os.path.abspath(output_dir)
-        logger.info(f"COCOフォーマットのデータセットを {zip_filename} に圧縮開始します。")
-        shutil.make_archive(zip_filename, 'zip', base_dir=os.path.basename(zip_filename))
-        logger.info(f"COCOフォーマットのデータセットを {zip_filename} に圧縮終了しました。")
+        if args.archive_format == 'zip':
+            logger.info(f"COCOフォーマットのデータセットを {os.path.abspath(output_dir)} に圧縮開始します。")
+            zip_filename = archive_superbai_dataset(output_dir)
+            logger.info(f"COCOフォーマットのデータセットを {zip_filename} に圧縮終了しました。")
         
 
     except Exception as e: